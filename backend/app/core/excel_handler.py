@@ -1,11 +1,12 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import openpyxl
 from openpyxl.styles import PatternFill, Border, Side
 from dateutil.parser import parse
-from ..models.plant import Plant
+from ..models.plant import Plant, format_date
 import os
+import threading
 import time
 
 class ExcelHandler:
@@ -17,12 +18,21 @@ class ExcelHandler:
         self._cache: Optional[List[Dict[str, Any]]] = None
         self._cache_timestamp: Optional[float] = None
         self._file_mtime: Optional[float] = None
+        # Derived data built from self._cache, reset whenever the cache reloads
+        self._formatted_cache: Optional[List[Dict[str, Any]]] = None
+        self._history_index: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._watering_index: Optional[Dict[str, List[date]]] = None
+        # Endpoints run in FastAPI's threadpool: one thread reloads the file while others wait,
+        # and derived data is never built from a version that was just replaced
+        self._lock = threading.RLock()
         
         # Preload cache on initialization
         self._load_cache()
     
     def _load_cache(self):
         """Load data into cache"""
+        # Data derived from the previous version must go even if the reload fails
+        self._clear_derived_caches()
         try:
             self._cache = self._read_data_uncached()
             self._cache_timestamp = time.time()
@@ -45,9 +55,16 @@ class ExcelHandler:
     def _invalidate_cache(self):
         """Invalidate the cache"""
         self._cache = None
+        self._clear_derived_caches()
         self._cache_timestamp = None
         self._file_mtime = None
     
+    def _clear_derived_caches(self):
+        """Drop data derived from the cached rows"""
+        self._formatted_cache = None
+        self._history_index = None
+        self._watering_index = None
+    
     def _ensure_file_exists(self):
         """Ensure the Excel file exists, create if it doesn't"""
         if not self.file_path.exists():
@@ -115,7 +132,7 @@ class ExcelHandler:
                 # Add entries for each plant
                 for plant in plant_names:
                     ws.append([
-                        current_date.strftime("%d.%m.%Y"),
+                        format_date(current_date),
                         plant,
                         "",  # days without water
                         "",  # water
@@ -151,10 +168,8 @@ class ExcelHandler:
                     continue
 
                 if care_type == "water":
-                    days_wo_water = row[2]
-                    water_entry = row[3]  # Index 3 is the "water" column
-                    # Check both "days without water" and "water" columns
-                    if days_wo_water == 0 or (isinstance(days_wo_water, str) and days_wo_water.strip() == "0") or water_entry:
+                    # Index 2 is "days without water", index 3 is the "water" column
+                    if self._is_watered(row[2], row[3]):
                         last_date = date
                 elif care_type == "fertilizer":
                     fertilizer_value = row[4]
@@ -165,23 +180,22 @@ class ExcelHandler:
     def get_todays_plants(self) -> List[Plant]:
         """Get all plants with their current care status using cached data"""
         try:
-            # Use cached data instead of loading workbook
-            data = self.read_data()  # This will use cache
+            # Use cached data instead of loading workbook; freshness is checked once per call
+            with self._lock:
+                data = self._ensure_fresh()
+                history_index = self._get_history_index()
             
             today = datetime.now().date()
             plants = []
             
-            # Get unique plant names from cached data
-            plant_names = []
-            for row in data:
-                plant_name = row.get("plant name")
-                if plant_name and plant_name not in plant_names:
-                    plant_names.append(plant_name)
+            # Get unique plant names from cached data, preserving original order
+            plant_names = dict.fromkeys(row.get("plant name") for row in data if row.get("plant name"))
             
             for idx, plant_name in enumerate(plant_names, 1):
-                # Get last care dates from cached data
-                last_watered = self._get_last_care_date_from_cache(data, plant_name, "water")
-                last_fertilized = self._get_last_care_date_from_cache(data, plant_name, "fertilizer")
+                # Get last care dates from the per-plant history index
+                plant_history = history_index.get(plant_name, [])
+                last_watered = self._get_last_care_date_from_history(plant_history, "water")
+                last_fertilized = self._get_last_care_date_from_history(plant_history, "fertilizer")
                 
                 # Calculate days since last care
                 days_since_watering = (today - last_watered).days if last_watered else None
@@ -209,13 +223,50 @@ class ExcelHandler:
     
     def read_data(self) -> List[Dict[str, Any]]:
         """Read data from Excel file with caching"""
+        with self._lock:
+            return self._ensure_fresh().copy()  # Return a copy to prevent external modifications
+    
+    def _ensure_fresh(self) -> List[Dict[str, Any]]:
+        """
+        Reload the cache if the file changed and return the cached rows (not copied, don't modify).
+        Empty if the data could not be loaded. Callers hold self._lock.
+        """
         # Check if cache is valid
-        if self._is_cache_valid() and self._cache is not None:
-            return self._cache.copy()  # Return a copy to prevent external modifications
-        
-        # Cache is invalid or doesn't exist, reload
-        self._load_cache()
-        return self._cache.copy() if self._cache is not None else []
+        if not (self._is_cache_valid() and self._cache is not None):
+            # Cache is invalid or doesn't exist, reload
+            self._load_cache()
+        return self._cache if self._cache is not None else []
+    
+    def get_data_version(self) -> Optional[float]:
+        """
+        Modification time of the file version currently cached (reloads if the file changed).
+        None if the data could not be loaded.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            return self._file_mtime if self._cache is not None else None
+    
+    def get_formatted_data(self) -> List[Dict[str, Any]]:
+        """
+        Get all rows with dates formatted as dd.mm.yyyy.
+        Built once per file version; the returned list is shared, don't modify it.
+        """
+        with self._lock:
+            data = self._ensure_fresh()  # Reloads (and resets derived data) if the file changed
+            
+            if self._formatted_cache is None:
+                formatted = []
+                for row in data:
+                    row_copy = row.copy()
+                    if row_copy.get("date") and not isinstance(row_copy["date"], str):
+                        try:
+                            row_copy["date"] = format_date(row_copy["date"])
+                        except:
+                            pass
+                    formatted.append(row_copy)
+                self._formatted_cache = formatted
+            
+            return self._formatted_cache
     
     def _read_data_uncached(self) -> List[Dict[str, Any]]:
         """Read data from Excel file without caching (internal use)"""
@@ -237,94 +288,118 @@ class ExcelHandler:
     
     def write_data(self, data: List[Dict[str, Any]]):
         """Write data to Excel file while preserving formatting"""
-        wb = openpyxl.load_workbook(self.file_path)
-        ws = wb.active
-        
-        # Clear existing data (except headers)
-        for row in range(2, ws.max_row + 1):
-            for col in range(1, ws.max_column + 1):
-                ws.cell(row=row, column=col).value = None
-        
-        # Write new data
-        headers = [cell.value for cell in ws[1]]
-        for row_data in data:
-            row = []
-            for header in headers:
-                row.append(row_data.get(header, ""))
-            ws.append(row)
-        
-        wb.save(self.file_path)
-        
-        # Invalidate cache after writing
-        self._invalidate_cache()
+        with self._lock:
+            wb = openpyxl.load_workbook(self.file_path)
+            ws = wb.active
+            
+            # Clear existing data (except headers)
+            for row in range(2, ws.max_row + 1):
+                for col in range(1, ws.max_column + 1):
+                    ws.cell(row=row, column=col).value = None
+            
+            # Write new data
+            headers = [cell.value for cell in ws[1]]
+            for row_data in data:
+                row = []
+                for header in headers:
+                    row.append(row_data.get(header, ""))
+                ws.append(row)
+            
+            wb.save(self.file_path)
+            
+            # Invalidate cache after writing
+            self._invalidate_cache()
     
     def get_plant_history(self, plant_name: str) -> List[Dict[str, Any]]:
         """
         Get all historical entries for a specific plant, ordered by date.
-        Uses cached data for better performance.
+        Served from a per-plant index built once per file version;
+        the returned list is shared, don't modify it.
         """
-        # Use cached data
-        data = self.read_data()
-        
-        # Filter for this plant
-        plant_data = []
+        with self._lock:
+            self._ensure_fresh()  # Reloads (and resets derived data) if the file changed
+            return self._get_history_index().get(plant_name, [])
+    
+    def get_watering_dates(self, plant_name: str) -> List[date]:
+        """
+        Get the dates a plant was watered, oldest first.
+        Computed for all plants at once from the history index, once per file version;
+        the returned list is shared, don't modify it.
+        """
+        with self._lock:
+            self._ensure_fresh()  # Reloads (and resets derived data) if the file changed
+            
+            if self._watering_index is None:
+                self._watering_index = self._build_watering_index(self._get_history_index())
+            
+            return self._watering_index.get(plant_name, [])
+    
+    def _get_history_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        """The per-plant history index of the cached rows, built on first use. Callers hold self._lock."""
+        if self._history_index is None:
+            self._history_index = self._build_history_index(self._cache or [])
+        return self._history_index
+    
+    def _build_watering_index(self, history_index: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[date]]:
+        """Collect each plant's watering event dates from its (date-sorted) history"""
+        index = {}
+        for plant_name, plant_data in history_index.items():
+            index[plant_name] = [entry["date"] for entry in plant_data if entry["watered"]]
+        return index
+    
+    def _build_history_index(self, data: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Group rows by plant name in one pass, with parsed dates and a watered flag, oldest first"""
+        index = {}
         for row in data:
-            if row.get("plant name") == plant_name and row.get("date"):
-                # Parse date
-                date_value = row["date"]
-                if isinstance(date_value, str):
-                    try:
-                        date_value = datetime.strptime(date_value, "%d.%m.%Y").date()
-                    except ValueError:
-                        try:
-                            date_value = parse(date_value).date()
-                        except:
-                            continue  # Skip if date can't be parsed
-                elif isinstance(date_value, datetime):
-                    date_value = date_value.date()
-                else:
-                    continue  # Skip if date is missing or invalid
-                
-                row_copy = row.copy()
-                row_copy["date"] = date_value  # Replace with parsed date
-                plant_data.append(row_copy)
+            plant_name = row.get("plant name")
+            if not plant_name or not row.get("date"):
+                continue
+            
+            date_value = self._parse_history_date(row["date"])
+            if date_value is None:
+                continue  # Skip if date can't be parsed
+            
+            row_copy = row.copy()
+            row_copy["date"] = date_value  # Replace with parsed date
+            row_copy["watered"] = self._is_watered(row.get("days without water"), row.get("water"))
+            index.setdefault(plant_name, []).append(row_copy)
         
         # Sort by date (oldest first)
-        plant_data.sort(key=lambda x: x["date"])
+        for plant_data in index.values():
+            plant_data.sort(key=lambda x: x["date"])
         
-        return plant_data
+        return index
     
-    def _get_last_care_date_from_cache(self, data: List[Dict[str, Any]], plant_name: str, care_type: str) -> Optional[datetime]:
-        """Get the last date a plant received care from cached data"""
-        last_date = None
-        
-        for row in data:
-            if row.get("plant name") == plant_name:
-                # Parse date robustly
+    @staticmethod
+    def _is_watered(days_wo_water, water_entry) -> bool:
+        """A watering event: "days without water" is 0 (number or "0" text), or a water amount was entered"""
+        if isinstance(days_wo_water, str):
+            days_wo_water = days_wo_water.strip()
+        return days_wo_water == 0 or days_wo_water == "0" or bool(water_entry)
+    
+    def _parse_history_date(self, date_value) -> Optional[date]:
+        """Parse a date cell (dd.mm.yyyy string or datetime), None if invalid"""
+        if isinstance(date_value, str):
+            try:
+                return datetime.strptime(date_value, "%d.%m.%Y").date()
+            except ValueError:
                 try:
-                    date = None
-                    date_value = row.get("date")
-                    if isinstance(date_value, str):
-                        try:
-                            date = datetime.strptime(date_value, "%d.%m.%Y").date()
-                        except ValueError:
-                            date = parse(date_value).date()
-                    elif isinstance(date_value, datetime):
-                        date = date_value.date()
-                    if not date:
-                        continue
-                except Exception:
-                    continue
-
-                if care_type == "water":
-                    days_wo_water = row.get("days without water")
-                    water_entry = row.get("water")  # Get the "water" column value
-                    # Check both "days without water" and "water" columns
-                    if days_wo_water == 0 or (isinstance(days_wo_water, str) and str(days_wo_water).strip() == "0") or water_entry:
-                        last_date = date
-                elif care_type == "fertilizer":
-                    fertilizer_value = row.get("fertilizer")
-                    if fertilizer_value and str(fertilizer_value).strip() != "":
-                        last_date = date
+                    return parse(date_value).date()
+                except:
+                    return None
+        elif isinstance(date_value, datetime):
+            return date_value.date()
+        return None
+    
+    def _get_last_care_date_from_history(self, plant_history: List[Dict[str, Any]], care_type: str) -> Optional[date]:
+        """Get the last date a plant received care from its (date-sorted) history"""
+        for entry in reversed(plant_history):
+            if care_type == "water":
+                if entry["watered"]:
+                    return entry["date"]
+            elif care_type == "fertilizer":
+                fertilizer_value = entry.get("fertilizer")
+                if fertilizer_value and str(fertilizer_value).strip() != "":
+                    return entry["date"]
         
-        return last_date 
\ No newline at end of file
+        return None
@@ -10,6 +10,7 @@ This handles:
 import os
 from typing import Generator
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 from dotenv import load_dotenv
@@ -38,15 +39,6 @@ class DatabaseManager:
     def _initialize_connection(self):
         """Initialize database connection from environment variables."""
         
-        # Get database configuration from environment
-        db_config = {
-            'host': os.getenv('DB_HOST'),
-            'port': os.getenv('DB_PORT', '5432'),
-            'database': os.getenv('DB_NAME'),
-            'username': os.getenv('DB_USER'),
-            'password': os.getenv('DB_PASSWORD')
-        }
-        
         # Validate required environment variables
         required_vars = ['DB_HOST', 'DB_NAME', 'DB_USER', 'DB_PASSWORD']
         missing_vars = [var for var in required_vars if not os.getenv(var)]
@@ -54,16 +46,20 @@ class DatabaseManager:
         if missing_vars:
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
         
-        # Build connection string
-        connection_string = (
-            f"postgresql://{db_config['username']}:{db_config['password']}"
-            f"@{db_config['host']}:{db_config['port']}/{db_config['database']}"
+        # Build connection URL (URL.create escapes special characters in the password)
+        connection_url = URL.create(
+            drivername='postgresql',
+            username=os.getenv('DB_USER'),
+            password=os.getenv('DB_PASSWORD'),
+            host=os.getenv('DB_HOST'),
+            port=int(os.getenv('DB_PORT', '5432')),
+            database=os.getenv('DB_NAME')
         )
         
         # Create engine with connection pooling
         self.engine = create_engine(
-            connection_string,
-            echo=True,  # Set to True for SQL query logging during development
+            connection_url,
+            echo=os.getenv('DB_ECHO', 'false').lower() == 'true',  # DB_ECHO=true logs every SQL query
             pool_size=5,
             pool_pre_ping=True,  # Validate connections before use
             pool_recycle=3600    # Recycle connections after 1 hour
@@ -7,7 +7,8 @@ Run this from your project root directory.
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, Date, Text, DateTime, ForeignKey, UniqueConstraint, text
+from sqlalchemy import create_engine, Column, Integer, String, Date, Text, DateTime, ForeignKey, UniqueConstraint, Index, text
+from sqlalchemy.engine import URL
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
@@ -44,6 +45,11 @@ class DailyCare(Base):
     
     plant = relationship("Plant", back_populates="care_records")
 
+# Partial indexes for the "IS NOT NULL" activity filters (same as models.py)
+Index("ix_care_water_notnull", DailyCare.care_date, postgresql_where=DailyCare.water_ml.isnot(None))
+Index("ix_care_fertilizer_notnull", DailyCare.care_date, postgresql_where=DailyCare.fertilizer.isnot(None))
+Index("ix_care_treatment_notnull", DailyCare.care_date, postgresql_where=DailyCare.treatment.isnot(None))
+
 def main():
     print("🌱 Plant Care Database Setup (Simple Version)")
     print("=" * 50)
@@ -73,15 +79,19 @@ def main():
         print("   Check your .env file in the project root")
         return False
     
-    # Build connection string
-    connection_string = (
-        f"postgresql://{db_config['username']}:{db_config['password']}"
-        f"@{db_config['host']}:{db_config['port']}/{db_config['database']}"
+    # Build connection URL (URL.create escapes special characters in the password)
+    connection_url = URL.create(
+        drivername='postgresql',
+        username=db_config['username'],
+        password=db_config['password'],
+        host=db_config['host'],
+        port=int(db_config['port']),
+        database=db_config['database']
     )
     
     try:
         print(f"\n🔌 Connecting to database...")
-        engine = create_engine(connection_string, echo=False)
+        engine = create_engine(connection_url, echo=False)
         
         # Test connection
         with engine.connect() as conn:
@@ -14,6 +14,7 @@ from typing import Dict, Any, List, Optional
 import openpyxl
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import IntegrityError
 
@@ -44,20 +45,17 @@ class ExcelMigrator:
     
     def _setup_database(self):
         """Setup database connection using .env credentials."""
-        db_config = {
-            'host': os.getenv('DB_HOST'),
-            'port': os.getenv('DB_PORT', '5432'),
-            'database': os.getenv('DB_NAME'),
-            'username': os.getenv('DB_USER'),
-            'password': os.getenv('DB_PASSWORD')
-        }
-        
-        connection_string = (
-            f"postgresql://{db_config['username']}:{db_config['password']}"
-            f"@{db_config['host']}:{db_config['port']}/{db_config['database']}"
+        # URL.create escapes special characters in the password
+        connection_url = URL.create(
+            drivername='postgresql',
+            username=os.getenv('DB_USER'),
+            password=os.getenv('DB_PASSWORD'),
+            host=os.getenv('DB_HOST'),
+            port=int(os.getenv('DB_PORT', '5432')),
+            database=os.getenv('DB_NAME')
         )
         
-        self.engine = create_engine(connection_string, echo=False)
+        self.engine = create_engine(connection_url, echo=False)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
     
     def extract_plant_names(self) -> List[str]:
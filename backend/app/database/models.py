@@ -8,7 +8,7 @@ Normalized design with two tables:
 
 from datetime import datetime, date
 from typing import Optional, List
-from sqlalchemy import Column, Integer, String, Date, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Date, Text, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, Mapped
 
@@ -79,6 +79,14 @@ class DailyCare(Base):
         return f"<DailyCare(plant_id={self.plant_id}, date={self.care_date}, water={self.water_ml})>"
 
 
+# Partial indexes (PostgreSQL) for the "IS NOT NULL" activity filters.
+# Each one only holds rows where that activity happened, so the event counts
+# and the "most recent watering" lookup (ORDER BY care_date DESC) can use them.
+Index("ix_care_water_notnull", DailyCare.care_date, postgresql_where=DailyCare.water_ml.isnot(None))
+Index("ix_care_fertilizer_notnull", DailyCare.care_date, postgresql_where=DailyCare.fertilizer.isnot(None))
+Index("ix_care_treatment_notnull", DailyCare.care_date, postgresql_where=DailyCare.treatment.isnot(None))
+
+
 # Convenience functions for common queries
 def get_plant_by_name(session, plant_name: str) -> Optional[Plant]:
     """Get a plant by name."""
@@ -183,27 +183,26 @@ def show_database_statistics():
     print("-" * 25)
     
     with db_manager.get_session() as session:
-        # Basic counts
-        plant_count = session.query(Plant).count()
-        care_count = session.query(DailyCare).count()
+        plant_count = session.query(func.count(Plant.id)).scalar()
         
-        # Date range
-        date_range = session.query(
+        # Care counts, date range and activity counts in one scan of daily_care.
+        # func.count(...).filter(...) renders as COUNT(...) FILTER (WHERE ...)
+        care_stats = session.query(
+            func.count(DailyCare.id).label('care_count'),
             func.min(DailyCare.care_date).label('first_date'),
-            func.max(DailyCare.care_date).label('last_date')
-        ).first()
-        
-        # Activity counts
-        water_count = session.query(DailyCare).filter(DailyCare.water_ml.isnot(None)).count()
-        fertilizer_count = session.query(DailyCare).filter(DailyCare.fertilizer.isnot(None)).count()
-        treatment_count = session.query(DailyCare).filter(DailyCare.treatment.isnot(None)).count()
+            func.max(DailyCare.care_date).label('last_date'),
+            func.count(DailyCare.id).filter(DailyCare.water_ml.isnot(None)).label('water_count'),
+            func.count(DailyCare.id).filter(DailyCare.fertilizer.isnot(None)).label('fertilizer_count'),
+            func.count(DailyCare.id).filter(DailyCare.treatment.isnot(None)).label('treatment_count')
+        ).one()
+        care_count = care_stats.care_count
         
         print(f"Total plants: {plant_count}")
         print(f"Total care records: {care_count}")
-        print(f"Date range: {date_range.first_date} to {date_range.last_date}")
-        print(f"Watering events: {water_count}")
-        print(f"Fertilizer events: {fertilizer_count}")
-        print(f"Treatment events: {treatment_count}")
+        print(f"Date range: {care_stats.first_date} to {care_stats.last_date}")
+        print(f"Watering events: {care_stats.water_count}")
+        print(f"Fertilizer events: {care_stats.fertilizer_count}")
+        print(f"Treatment events: {care_stats.treatment_count}")
         
         if plant_count > 0 and care_count > 0:
             avg_records = care_count / plant_count
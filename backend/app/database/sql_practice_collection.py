@@ -8,7 +8,9 @@ Each section builds on the previous one, from basic queries to advanced joins.
 Run this file: uv run python backend/app/database/sql_practice.py
 """
 
+import io
 import os
+import sys
 from datetime import date, timedelta
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
@@ -20,256 +22,163 @@ from connection import db_manager
 
 load_dotenv()
 
-class SQLPracticeSession:
-    """Interactive SQL learning session with your plant data."""
-    
-    def __init__(self):
-        self.db = db_manager
-        print("🌱 SQL Learning Session with Your Plant Care Data")
-        print("=" * 50)
-    
-    def section_1_basic_queries(self):
-        """
-        SECTION 1: Basic SELECT Queries
-        Learn: SELECT, FROM, basic syntax
-        """
-        print("\n📚 SECTION 1: Basic SELECT Queries")
-        print("-" * 40)
-        
-        # Exercise 1.1: Test connection
-        print("🔍 Exercise 1.1: Test database connection")
-        sql = "SELECT 1 as test_value"
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        print(f"Result: {result}")
-        
-        # Exercise 1.2: See all plants
-        print("\n🔍 Exercise 1.2: Show all plants")
-        sql = "SELECT * FROM plants"
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        print(f"Found {len(result)} plants:")
-        for plant in result[:5]:  # Show first 5
-            print(f"  - {plant}")
-        
-        # Exercise 1.3: Select specific columns
-        print("\n🔍 Exercise 1.3: Show only plant names")
-        sql = "SELECT name FROM plants"
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        plant_names = [row[0] for row in result]
-        print(f"Plant names: {plant_names[:10]}")  # Show first 10
-        
-        # Exercise 1.4: Count records
-        print("\n🔍 Exercise 1.4: Count total plants")
-        sql = "SELECT COUNT(*) FROM plants"
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        print(f"Total plants: {result[0][0]}")
-        
-        input("\n⏸️  Press Enter to continue to Section 2...")
-    
-    def section_2_filtering(self):
-        """
-        SECTION 2: WHERE Clauses (Filtering)
-        Learn: WHERE, comparison operators, LIKE, IS NULL/IS NOT NULL
-        """
-        print("\n📚 SECTION 2: Filtering with WHERE")
-        print("-" * 40)
-        
-        # Exercise 2.1: Filter by plant name
-        print("🔍 Exercise 2.1: Find specific plant")
-        sql = "SELECT * FROM plants WHERE name = 'Monstera Deliciosa'"
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        print(f"Result: {result}")
-        
-        # Exercise 2.2: Pattern matching with LIKE
-        print("\n🔍 Exercise 2.2: Find plants with 'monstera' in name")
-        sql = "SELECT name FROM plants WHERE name ILIKE '%monstera%'"
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        for row in result:
-            print(f"  - {row[0]}")
-        
-        # Exercise 2.3: Filter care records by date
-        print("\n🔍 Exercise 2.3: Care records from last 7 days")
-        week_ago = date.today() - timedelta(days=7)
-        sql = f"SELECT * FROM daily_care WHERE care_date >= '{week_ago}'"
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        print(f"Found {len(result)} care records from last week")
-        
-        # Exercise 2.4: Find plants that were watered (not NULL)
-        print("\n🔍 Exercise 2.4: Records where plants were actually watered")
-        sql = "SELECT plant_id, care_date, water_ml FROM daily_care WHERE water_ml IS NOT NULL"
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        print(f"Found {len(result)} watering records")
-        for row in result[:5]:
-            print(f"  Plant {row[0]}: {row[2]}ml on {row[1]}")
-        
-        input("\n⏸️  Press Enter to continue to Section 3...")
-    
-    def section_3_sorting_limiting(self):
-        """
-        SECTION 3: Sorting and Limiting Results  
-        Learn: ORDER BY, LIMIT, ASC/DESC
-        """
-        print("\n📚 SECTION 3: Sorting and Limiting")
-        print("-" * 40)
-        
-        # Exercise 3.1: Sort plants alphabetically
-        print("🔍 Exercise 3.1: Plants in alphabetical order")
-        sql = "SELECT name FROM plants ORDER BY name ASC"
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        for row in result[:10]:
-            print(f"  - {row[0]}")
-        
-        # Exercise 3.2: Most recent care records
-        print("\n🔍 Exercise 3.2: 5 most recent care activities")
-        sql = "SELECT plant_id, care_date, water_ml FROM daily_care ORDER BY care_date DESC LIMIT 5"
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        for row in result:
-            print(f"  Plant {row[0]}: {row[2]}ml on {row[1]}")
-        
-        # Exercise 3.3: Largest watering amounts
-        print("\n🔍 Exercise 3.3: Top 5 largest watering amounts")
-        sql = "SELECT plant_id, care_date, water_ml FROM daily_care WHERE water_ml IS NOT NULL ORDER BY water_ml DESC LIMIT 5"
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
+
+# Formatters: each one receives the buffered print helper and the query result
+
+def show_result(p, result):
+    p(f"Result: {result}")
+
+
+def show_rows(line, limit=None, header=None):
+    """Build a formatter printing an optional header and one line per row."""
+    def fmt(p, result):
+        if header:
+            p(header.format(n=len(result)))
+        for row in result[:limit]:
+            p(line.format(*row, row=row))
+    return fmt
+
+
+def show_count(header):
+    """Build a formatter printing only the number of returned rows."""
+    def fmt(p, result):
+        p(header.format(n=len(result)))
+    return fmt
+
+
+def show_plant_names(p, result):
+    plant_names = [row[0] for row in result]
+    p(f"Plant names: {plant_names[:10]}")  # Show first 10
+
+
+def show_never_watered(p, result):
+    if result:
+        p("Plants never watered:")
         for row in result:
-            print(f"  Plant {row[0]}: {row[2]}ml on {row[1]}")
-        
-        input("\n⏸️  Press Enter to continue to Section 4...")
-    
-    def section_4_aggregations(self):
-        """
-        SECTION 4: Aggregate Functions
-        Learn: COUNT, SUM, AVG, MIN, MAX
-        """
-        print("\n📚 SECTION 4: Aggregate Functions")
-        print("-" * 40)
-        
-        # Exercise 4.1: Count care records per plant
-        print("🔍 Exercise 4.1: Total care records per plant")
-        sql = """
+            p(f"  - {row[0]}")
+    else:
+        p("Great! All plants have been watered at least once.")
+
+
+def show_needing_water(p, result):
+    p("Plants needing water:")
+    for row in result[:10]:
+        last_watered = row[1] if row[1] else "Never"
+        p(f"  {row[0]}: last watered {last_watered}")
+
+
+# Exercises per section: (title, sql, formatter)
+# {week_ago} / {month_ago} placeholders are filled in when the section runs
+
+EXERCISES_SECTION_1 = [
+    ("1.1: Test database connection",
+     "SELECT 1 as test_value",
+     show_result),
+    ("1.2: Show all plants",
+     "SELECT * FROM plants",
+     show_rows("  - {row}", limit=5, header="Found {n} plants:")),
+    ("1.3: Show only plant names",
+     "SELECT name FROM plants",
+     show_plant_names),
+    ("1.4: Count total plants",
+     "SELECT COUNT(*) FROM plants",
+     show_rows("Total plants: {}")),
+]
+
+EXERCISES_SECTION_2 = [
+    ("2.1: Find specific plant",
+     "SELECT * FROM plants WHERE name = 'Monstera Deliciosa'",
+     show_result),
+    ("2.2: Find plants with 'monstera' in name",
+     "SELECT name FROM plants WHERE name ILIKE '%monstera%'",
+     show_rows("  - {}")),
+    ("2.3: Care records from last 7 days",
+     "SELECT * FROM daily_care WHERE care_date >= '{week_ago}'",
+     show_count("Found {n} care records from last week")),
+    ("2.4: Records where plants were actually watered",
+     "SELECT plant_id, care_date, water_ml FROM daily_care WHERE water_ml IS NOT NULL",
+     show_rows("  Plant {0}: {2}ml on {1}", limit=5, header="Found {n} watering records")),
+]
+
+EXERCISES_SECTION_3 = [
+    ("3.1: Plants in alphabetical order",
+     "SELECT name FROM plants ORDER BY name ASC",
+     show_rows("  - {}", limit=10)),
+    ("3.2: 5 most recent care activities",
+     "SELECT plant_id, care_date, water_ml FROM daily_care ORDER BY care_date DESC LIMIT 5",
+     show_rows("  Plant {0}: {2}ml on {1}")),
+    ("3.3: Top 5 largest watering amounts",
+     "SELECT plant_id, care_date, water_ml FROM daily_care WHERE water_ml IS NOT NULL ORDER BY water_ml DESC LIMIT 5",
+     show_rows("  Plant {0}: {2}ml on {1}")),
+]
+
+EXERCISES_SECTION_4 = [
+    ("4.1: Total care records per plant",
+     """
         SELECT plant_id, COUNT(*) as total_records 
         FROM daily_care 
         GROUP BY plant_id 
         ORDER BY total_records DESC
-        """
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        for row in result[:5]:
-            print(f"  Plant {row[0]}: {row[1]} care records")
-        
-        # Exercise 4.2: Total water given to each plant
-        print("\n🔍 Exercise 4.2: Total water given to each plant")
-        sql = """
+        """,
+     show_rows("  Plant {0}: {1} care records", limit=5)),
+    ("4.2: Total water given to each plant",
+     """
         SELECT plant_id, SUM(water_ml) as total_water_ml 
         FROM daily_care 
         WHERE water_ml IS NOT NULL 
         GROUP BY plant_id 
         ORDER BY total_water_ml DESC
-        """
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        for row in result[:5]:
-            print(f"  Plant {row[0]}: {row[1]}ml total")
-        
-        # Exercise 4.3: Average water amount
-        print("\n🔍 Exercise 4.3: Average water amount per watering")
-        sql = "SELECT AVG(water_ml) as avg_water FROM daily_care WHERE water_ml IS NOT NULL"
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        print(f"Average water per watering: {result[0][0]:.1f}ml")
-        
-        # Exercise 4.4: Date ranges
-        print("\n🔍 Exercise 4.4: Date range of your care data")
-        sql = """
+        """,
+     show_rows("  Plant {0}: {1}ml total", limit=5)),
+    ("4.3: Average water amount per watering",
+     "SELECT AVG(water_ml) as avg_water FROM daily_care WHERE water_ml IS NOT NULL",
+     show_rows("Average water per watering: {0:.1f}ml")),
+    ("4.4: Date range of your care data",
+     """
         SELECT 
             MIN(care_date) as first_record,
             MAX(care_date) as last_record,
             COUNT(DISTINCT care_date) as total_days
         FROM daily_care
-        """
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        row = result[0]
-        print(f"Data spans from {row[0]} to {row[1]} ({row[2]} days)")
-        
-        input("\n⏸️  Press Enter to continue to Section 5...")
-    
-    def section_5_joins(self):
-        """
-        SECTION 5: JOINs - The Most Important SQL Concept!
-        Learn: INNER JOIN, LEFT JOIN, foreign keys
-        """
-        print("\n📚 SECTION 5: JOINs - Connecting Tables")
-        print("-" * 40)
-        
-        # Exercise 5.1: Basic INNER JOIN
-        print("🔍 Exercise 5.1: Plant names with their care records")
-        sql = """
+        """,
+     show_rows("Data spans from {0} to {1} ({2} days)")),
+]
+
+EXERCISES_SECTION_5 = [
+    ("5.1: Plant names with their care records",
+     """
         SELECT p.name, dc.care_date, dc.water_ml 
         FROM plants p 
         INNER JOIN daily_care dc ON p.id = dc.plant_id 
         WHERE dc.water_ml IS NOT NULL 
         ORDER BY dc.care_date DESC 
         LIMIT 10
-        """
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        for row in result:
-            print(f"  {row[0]}: {row[2]}ml on {row[1]}")
-        
-        # Exercise 5.2: LEFT JOIN to see all plants
-        print("\n🔍 Exercise 5.2: All plants, even those without care records")
-        sql = """
+        """,
+     show_rows("  {0}: {2}ml on {1}")),
+    ("5.2: All plants, even those without care records",
+     """
         SELECT p.name, COUNT(dc.id) as care_records
         FROM plants p 
         LEFT JOIN daily_care dc ON p.id = dc.plant_id 
         GROUP BY p.id, p.name
         ORDER BY care_records DESC
-        """
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        for row in result[:10]:
-            print(f"  {row[0]}: {row[1]} care records")
-        
-        # Exercise 5.3: Complex join with conditions
-        print("\n🔍 Exercise 5.3: Plants watered in last 30 days")
-        month_ago = date.today() - timedelta(days=30)
-        sql = f"""
+        """,
+     show_rows("  {0}: {1} care records", limit=10)),
+    ("5.3: Plants watered in last 30 days",
+     """
         SELECT DISTINCT p.name 
         FROM plants p 
         INNER JOIN daily_care dc ON p.id = dc.plant_id 
         WHERE dc.water_ml IS NOT NULL 
         AND dc.care_date >= '{month_ago}'
         ORDER BY p.name
-        """
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        print(f"Plants watered in last 30 days:")
-        for row in result:
-            print(f"  - {row[0]}")
-        
-        input("\n⏸️  Press Enter to continue to Section 6...")
-    
-    def section_6_advanced(self):
-        """
-        SECTION 6: Advanced Queries
-        Learn: Subqueries, HAVING, complex conditions
-        """
-        print("\n📚 SECTION 6: Advanced SQL")
-        print("-" * 40)
-        
-        # Exercise 6.1: Subquery - plants never watered
-        print("🔍 Exercise 6.1: Plants that have NEVER been watered")
-        sql = """
+        """,
+     show_rows("  - {0}", header="Plants watered in last 30 days:")),
+]
+
+EXERCISES_SECTION_6 = [
+    ("6.1: Plants that have NEVER been watered",
+     """
         SELECT name 
         FROM plants 
         WHERE id NOT IN (
@@ -277,50 +186,130 @@ class SQLPracticeSession:
             FROM daily_care 
             WHERE water_ml IS NOT NULL
         )
-        """
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        if result:
-            print("Plants never watered:")
-            for row in result:
-                print(f"  - {row[0]}")
-        else:
-            print("Great! All plants have been watered at least once.")
-        
-        # Exercise 6.2: HAVING clause
-        print("\n🔍 Exercise 6.2: Plants with more than 5 care records")
-        sql = """
+        """,
+     show_never_watered),
+    ("6.2: Plants with more than 5 care records",
+     """
         SELECT p.name, COUNT(dc.id) as care_count
         FROM plants p 
         INNER JOIN daily_care dc ON p.id = dc.plant_id 
         GROUP BY p.id, p.name
         HAVING COUNT(dc.id) > 5
         ORDER BY care_count DESC
-        """
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        for row in result:
-            print(f"  {row[0]}: {row[1]} records")
-        
-        # Exercise 6.3: Complex date query
-        print("\n🔍 Exercise 6.3: Plants not watered in last 7 days")
-        week_ago = date.today() - timedelta(days=7)
-        sql = f"""
+        """,
+     show_rows("  {0}: {1} records")),
+    ("6.3: Plants not watered in last 7 days",
+     """
         SELECT p.name, MAX(dc.care_date) as last_watered
         FROM plants p 
         LEFT JOIN daily_care dc ON p.id = dc.plant_id AND dc.water_ml IS NOT NULL
         GROUP BY p.id, p.name
         HAVING MAX(dc.care_date) < '{week_ago}' OR MAX(dc.care_date) IS NULL
         ORDER BY last_watered ASC NULLS FIRST
-        """
-        result = self.db.execute_raw_sql(sql)
-        print(f"Query: {sql}")
-        print("Plants needing water:")
-        for row in result[:10]:
-            last_watered = row[1] if row[1] else "Never"
-            print(f"  {row[0]}: last watered {last_watered}")
+        """,
+     show_needing_water),
+]
+
+
+class SQLPracticeSession:
+    """Interactive SQL learning session with your plant data."""
+    
+    def __init__(self):
+        self.db = db_manager
+        # Section output is collected here and written once per section
+        self._out = io.StringIO()
+        print("🌱 SQL Learning Session with Your Plant Care Data")
+        print("=" * 50)
+    
+    def p(self, *args, **kwargs):
+        """Buffer a line of section output (same arguments as print)."""
+        print(*args, file=self._out, **kwargs)
+    
+    def _flush(self):
+        """Write the buffered section output to stdout in one go."""
+        sys.stdout.write(self._out.getvalue())
+        sys.stdout.flush()
+        self._out.seek(0)
+        self._out.truncate()
+    
+    def _run_section(self, heading: str, exercises: list):
+        """Print the section heading, then run and format each exercise (output is flushed even on errors)."""
+        today = date.today()
+        dates = {
+            "week_ago": today - timedelta(days=7),
+            "month_ago": today - timedelta(days=30),
+        }
+        
+        self.p(f"\n📚 {heading}")
+        self.p("-" * 40)
         
-        print("\n🎉 Congratulations! You've completed the SQL basics!")
+        try:
+            for i, (title, sql, fmt) in enumerate(exercises):
+                sql = sql.format(**dates)
+                if i > 0:
+                    self.p()
+                self.p(f"🔍 Exercise {title}")
+                # execute_raw_sql prints its own errors, so earlier output goes out first
+                self._flush()
+                result = self.db.execute_raw_sql(sql)
+                self.p(f"Query: {sql}")
+                fmt(self.p, result)
+        finally:
+            self._flush()
+    
+    def section_1_basic_queries(self):
+        """
+        SECTION 1: Basic SELECT Queries
+        Learn: SELECT, FROM, basic syntax
+        """
+        self._run_section("SECTION 1: Basic SELECT Queries", EXERCISES_SECTION_1)
+        self._flush()
+        input("\n⏸️  Press Enter to continue to Section 2...")
+    
+    def section_2_filtering(self):
+        """
+        SECTION 2: WHERE Clauses (Filtering)
+        Learn: WHERE, comparison operators, LIKE, IS NULL/IS NOT NULL
+        """
+        self._run_section("SECTION 2: Filtering with WHERE", EXERCISES_SECTION_2)
+        self._flush()
+        input("\n⏸️  Press Enter to continue to Section 3...")
+    
+    def section_3_sorting_limiting(self):
+        """
+        SECTION 3: Sorting and Limiting Results  
+        Learn: ORDER BY, LIMIT, ASC/DESC
+        """
+        self._run_section("SECTION 3: Sorting and Limiting", EXERCISES_SECTION_3)
+        self._flush()
+        input("\n⏸️  Press Enter to continue to Section 4...")
+    
+    def section_4_aggregations(self):
+        """
+        SECTION 4: Aggregate Functions
+        Learn: COUNT, SUM, AVG, MIN, MAX
+        """
+        self._run_section("SECTION 4: Aggregate Functions", EXERCISES_SECTION_4)
+        self._flush()
+        input("\n⏸️  Press Enter to continue to Section 5...")
+    
+    def section_5_joins(self):
+        """
+        SECTION 5: JOINs - The Most Important SQL Concept!
+        Learn: INNER JOIN, LEFT JOIN, foreign keys
+        """
+        self._run_section("SECTION 5: JOINs - Connecting Tables", EXERCISES_SECTION_5)
+        self._flush()
+        input("\n⏸️  Press Enter to continue to Section 6...")
+    
+    def section_6_advanced(self):
+        """
+        SECTION 6: Advanced Queries
+        Learn: Subqueries, HAVING, complex conditions
+        """
+        self._run_section("SECTION 6: Advanced SQL", EXERCISES_SECTION_6)
+        self.p("\n🎉 Congratulations! You've completed the SQL basics!")
+        self._flush()
     
     def run_all_sections(self):
         """Run all SQL learning sections."""
@@ -11,9 +11,10 @@ This script:
 
 import sys
 from pathlib import Path
-from datetime import datetime, date
+from datetime import date
+from collections import deque
 import openpyxl
-from sqlalchemy import func
+from sqlalchemy import func, select, text
 
 # Add the project root to Python path
 project_root = Path(__file__).parent.parent.parent.parent
@@ -23,71 +24,112 @@ from backend.app.database.connection import db_manager, test_connection
 from backend.app.database.models import Plant, DailyCare
 
 
-def count_excel_data(excel_path: str) -> dict:
-    """Count records in Excel file for comparison."""
-    wb = openpyxl.load_workbook(excel_path, data_only=True)
+# Excel serial days count from here (exact for every date after 1900-02-28)
+EXCEL_EPOCH_ORDINAL = date(1899, 12, 30).toordinal()
+
+
+def count_rows(session, column, *criteria, select_from=None, join=None) -> int:
+    """
+    Run SELECT COUNT(column) with optional FROM / JOIN and WHERE criteria.
+    SQLAlchemy caches the compiled SQL per statement shape, so repeated
+    counts only bind new parameter values.
+    """
+    stmt = select(func.count(column))
+    if select_from is not None:
+        stmt = stmt.select_from(select_from)
+    if join is not None:
+        stmt = stmt.join(join)
+    return session.execute(stmt.where(*criteria)).scalar()
+
+
+def is_present(value) -> bool:
+    """True for a filled cell: non-blank strings and truthy numbers/dates."""
+    if isinstance(value, str):
+        return value.strip() != ""
+    return bool(value)
+
+
+def iter_excel_rows(excel_path: str, stats: dict):
+    """
+    Stream the data rows (first nine columns) of the Excel file.
+    
+    The counters in stats are updated while rows pass through, so a caller
+    that also needs the rows gets the counts from the same single pass.
+    unique_plants / unique_dates are filled in once the stream is exhausted.
+    """
+    wb = openpyxl.load_workbook(excel_path, data_only=True, read_only=True)
     ws = wb.active
     
+    plants_seen = {}
+    dates_seen = {}
+    
+    try:
+        # Stream rows once; random ws.cell() access re-parses rows in read-only mode
+        for row in ws.iter_rows(min_row=2, max_col=9, values_only=True):
+            date_val, plant_name, _c3, water, fertilizer, _c6, wash, neemoil, pestmix = row
+            
+            if date_val and plant_name:
+                stats['total_rows'] += 1
+                plants_seen[str(plant_name).strip()] = None
+                
+                # Day ordinals as keys: un-styled date cells arrive as Excel serial
+                # numbers, styled ones as datetimes; strings are not counted
+                if isinstance(date_val, (int, float)):
+                    dates_seen[EXCEL_EPOCH_ORDINAL + int(date_val)] = None
+                elif isinstance(date_val, date):
+                    dates_seen[date_val.toordinal()] = None
+                
+                if is_present(water):
+                    stats['water_events'] += 1
+                
+                if is_present(fertilizer):
+                    stats['fertilizer_events'] += 1
+                
+                if is_present(wash) or is_present(neemoil) or is_present(pestmix):
+                    stats['treatment_events'] += 1
+                
+                yield row
+        
+        stats['unique_plants'] = len(plants_seen)
+        stats['unique_dates'] = len(dates_seen)
+    finally:
+        wb.close()
+
+
+
+def count_excel_data(excel_path: str) -> dict:
+    """Count records in Excel file for comparison."""
     stats = {
         'total_rows': 0,
-        'unique_plants': set(),
-        'unique_dates': set(),
+        'unique_plants': 0,
+        'unique_dates': 0,
         'water_events': 0,
         'fertilizer_events': 0,
         'treatment_events': 0
     }
     
-    for row_num in range(2, ws.max_row + 1):
-        date_val = ws.cell(row=row_num, column=1).value
-        plant_name = ws.cell(row=row_num, column=2).value
-        water = ws.cell(row=row_num, column=4).value
-        fertilizer = ws.cell(row=row_num, column=5).value
-        wash = ws.cell(row=row_num, column=7).value
-        neemoil = ws.cell(row=row_num, column=8).value
-        pestmix = ws.cell(row=row_num, column=9).value
-        
-        if date_val and plant_name:
-            stats['total_rows'] += 1
-            stats['unique_plants'].add(str(plant_name).strip())
-            
-            if isinstance(date_val, datetime):
-                stats['unique_dates'].add(date_val.date())
-            
-            if water and str(water).strip():
-                stats['water_events'] += 1
-            
-            if fertilizer and str(fertilizer).strip():
-                stats['fertilizer_events'] += 1
-            
-            if (wash and str(wash).strip()) or (neemoil and str(neemoil).strip()) or (pestmix and str(pestmix).strip()):
-                stats['treatment_events'] += 1
-    
-    wb.close()
-    
-    stats['unique_plants'] = len(stats['unique_plants'])
-    stats['unique_dates'] = len(stats['unique_dates'])
+    # Only the counts are needed here, so drain the row stream
+    deque(iter_excel_rows(excel_path, stats), maxlen=0)
     
     return stats
 
 
 def count_database_data() -> dict:
     """Count records in database for comparison."""
-    stats = {}
-    
+    # One round-trip and a single scan of daily_care for all counts
     with db_manager.get_session() as session:
-        stats['total_plants'] = session.query(Plant).count()
-        stats['total_care_records'] = session.query(DailyCare).count()
-        
-        # Unique dates
-        unique_dates = session.query(func.count(func.distinct(DailyCare.care_date))).scalar()
-        stats['unique_dates'] = unique_dates
-        
-        # Activity counts
-        stats['water_events'] = session.query(DailyCare).filter(DailyCare.water_ml.isnot(None)).count()
-        stats['fertilizer_events'] = session.query(DailyCare).filter(DailyCare.fertilizer.isnot(None)).count()
-        stats['treatment_events'] = session.query(DailyCare).filter(DailyCare.treatment.isnot(None)).count()
+        row = session.execute(text("""
+            SELECT
+                (SELECT COUNT(*) FROM plants) AS total_plants,
+                COUNT(*) AS total_care_records,
+                COUNT(DISTINCT care_date) AS unique_dates,
+                COUNT(*) FILTER (WHERE water_ml IS NOT NULL) AS water_events,
+                COUNT(*) FILTER (WHERE fertilizer IS NOT NULL) AS fertilizer_events,
+                COUNT(*) FILTER (WHERE treatment IS NOT NULL) AS treatment_events
+            FROM daily_care
+        """)).one()
     
-    return stats
+    return dict(row._mapping)
 
 
 def verify_relationships():
@@ -96,8 +138,8 @@ def verify_relationships():
     
     with db_manager.get_session() as session:
         # Test 1: Can we join plants and daily_care?
-        join_count = session.query(DailyCare).join(Plant).count()
-        care_count = session.query(DailyCare).count()
+        join_count = count_rows(session, DailyCare.id, select_from=DailyCare, join=Plant)
+        care_count = count_rows(session, DailyCare.id)
         
         if join_count == care_count:
             print("   ✅ All care records have valid plant references")
@@ -105,15 +147,22 @@ def verify_relationships():
             print(f"   ❌ Found orphaned care records: {care_count - join_count}")
         
         # Test 2: Can we access plant from care record?
-        sample_care = session.query(DailyCare).first()
+        # Joining through DailyCare.plant tests the relationship without hydrating rows
+        sample_care = session.query(DailyCare.id, Plant.name)\
+            .join(DailyCare.plant)\
+            .limit(1)\
+            .first()
         if sample_care:
-            plant_name = sample_care.plant.name  # This tests the relationship
-            print(f"   ✅ Relationship working: Care record → {plant_name}")
+            print(f"   ✅ Relationship working: Care record → {sample_care.name}")
         
         # Test 3: Can we access care records from plant?
-        sample_plant = session.query(Plant).first()
+        sample_plant = session.query(Plant.id, Plant.name).limit(1).first()
         if sample_plant:
-            care_count = len(sample_plant.care_records)  # This tests back reference
+            # Count through Plant.care_records (tests back reference) without loading the records
+            care_count = count_rows(
+                session, DailyCare.id, Plant.id == sample_plant.id,
+                select_from=Plant, join=Plant.care_records,
+            )
             print(f"   ✅ Back-reference working: {sample_plant.name} has {care_count} care records")
 
 
@@ -123,21 +172,21 @@ def verify_data_samples():
     
     with db_manager.get_session() as session:
         # Show some plants
-        plants = session.query(Plant).limit(3).all()
+        plant_names = session.query(Plant.name).limit(3).all()
         print("   Sample plants:")
-        for plant in plants:
-            print(f"     • {plant.name}")
+        for (plant_name,) in plant_names:
+            print(f"     • {plant_name}")
         
         # Show some care records with details
-        care_records = session.query(DailyCare, Plant.name)\
+        care_records = session.query(DailyCare.water_ml, DailyCare.care_date, Plant.name)\
             .join(Plant)\
             .filter(DailyCare.water_ml.isnot(None))\
             .limit(3)\
             .all()
         
         print("   Sample watering records:")
-        for care, plant_name in care_records:
-            print(f"     • {plant_name}: {care.water_ml}ml on {care.care_date}")
+        for water_ml, care_date, plant_name in care_records:
+            print(f"     • {plant_name}: {water_ml}ml on {care_date}")
 
 
 def main():
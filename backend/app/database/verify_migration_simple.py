@@ -5,10 +5,12 @@ Verify Excel to PostgreSQL migration was successful (simplified for uv).
 
 import os
 from pathlib import Path
-from datetime import datetime, date
+from datetime import date
+from collections import deque
 import openpyxl
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, func, text
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.engine import URL
 from sqlalchemy.orm import sessionmaker
 
 # Import our models
@@ -19,87 +21,121 @@ load_dotenv()
 
 def setup_database():
     """Setup database connection."""
-    db_config = {
-        'host': os.getenv('DB_HOST'),
-        'port': os.getenv('DB_PORT', '5432'),
-        'database': os.getenv('DB_NAME'),
-        'username': os.getenv('DB_USER'),
-        'password': os.getenv('DB_PASSWORD')
-    }
-    
-    connection_string = (
-        f"postgresql://{db_config['username']}:{db_config['password']}"
-        f"@{db_config['host']}:{db_config['port']}/{db_config['database']}"
+    # URL.create escapes special characters in the password
+    connection_url = URL.create(
+        drivername='postgresql',
+        username=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        host=os.getenv('DB_HOST'),
+        port=int(os.getenv('DB_PORT', '5432')),
+        database=os.getenv('DB_NAME')
     )
     
-    engine = create_engine(connection_string, echo=False)
+    engine = create_engine(connection_url, echo=False)
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     return SessionLocal
 
-def count_excel_data(excel_path: str) -> dict:
-    """Count records in Excel for comparison."""
-    wb = openpyxl.load_workbook(excel_path, data_only=True)
+# Excel serial days count from here (exact for every date after 1900-02-28)
+EXCEL_EPOCH_ORDINAL = date(1899, 12, 30).toordinal()
+
+def count_rows(session, column, *criteria, select_from=None, join=None) -> int:
+    """
+    Run SELECT COUNT(column) with optional FROM / JOIN and WHERE criteria.
+    SQLAlchemy caches the compiled SQL per statement shape, so repeated
+    counts only bind new parameter values.
+    """
+    stmt = select(func.count(column))
+    if select_from is not None:
+        stmt = stmt.select_from(select_from)
+    if join is not None:
+        stmt = stmt.join(join)
+    return session.execute(stmt.where(*criteria)).scalar()
+
+def is_present(value) -> bool:
+    """True for a filled cell: non-blank strings and truthy numbers/dates."""
+    if isinstance(value, str):
+        return value.strip() != ""
+    return bool(value)
+
+def iter_excel_rows(excel_path: str, stats: dict):
+    """
+    Stream the data rows (first nine columns) of the Excel file.
+    
+    The counters in stats are updated while rows pass through, so a caller
+    that also needs the rows gets the counts from the same single pass.
+    unique_plants / unique_dates are filled in once the stream is exhausted.
+    """
+    wb = openpyxl.load_workbook(excel_path, data_only=True, read_only=True)
     ws = wb.active
     
+    plants_seen = {}
+    dates_seen = {}
+    
+    try:
+        # Stream rows once; random ws.cell() access re-parses rows in read-only mode
+        for row in ws.iter_rows(min_row=2, max_col=9, values_only=True):
+            date_val, plant_name, _c3, water, fertilizer, _c6, wash, neemoil, pestmix = row
+            
+            if date_val and plant_name:
+                stats['total_rows'] += 1
+                plants_seen[str(plant_name).strip()] = None
+                
+                # Day ordinals as keys: un-styled date cells arrive as Excel serial
+                # numbers, styled ones as datetimes; strings are not counted
+                if isinstance(date_val, (int, float)):
+                    dates_seen[EXCEL_EPOCH_ORDINAL + int(date_val)] = None
+                elif isinstance(date_val, date):
+                    dates_seen[date_val.toordinal()] = None
+                
+                if is_present(water):
+                    stats['water_events'] += 1
+                
+                if is_present(fertilizer):
+                    stats['fertilizer_events'] += 1
+                
+                if is_present(wash) or is_present(neemoil) or is_present(pestmix):
+                    stats['treatment_events'] += 1
+                
+                yield row
+        
+        stats['unique_plants'] = len(plants_seen)
+        stats['unique_dates'] = len(dates_seen)
+    finally:
+        wb.close()
+
+
+def count_excel_data(excel_path: str) -> dict:
+    """Count records in Excel for comparison."""
     stats = {
         'total_rows': 0,
-        'unique_plants': set(),
-        'unique_dates': set(),
+        'unique_plants': 0,
+        'unique_dates': 0,
         'water_events': 0,
         'fertilizer_events': 0,
         'treatment_events': 0
     }
     
-    for row_num in range(2, ws.max_row + 1):
-        date_val = ws.cell(row=row_num, column=1).value
-        plant_name = ws.cell(row=row_num, column=2).value
-        water = ws.cell(row=row_num, column=4).value
-        fertilizer = ws.cell(row=row_num, column=5).value
-        wash = ws.cell(row=row_num, column=7).value
-        neemoil = ws.cell(row=row_num, column=8).value
-        pestmix = ws.cell(row=row_num, column=9).value
-        
-        if date_val and plant_name:
-            stats['total_rows'] += 1
-            stats['unique_plants'].add(str(plant_name).strip())
-            
-            if isinstance(date_val, datetime):
-                stats['unique_dates'].add(date_val.date())
-            
-            if water and str(water).strip():
-                stats['water_events'] += 1
-            
-            if fertilizer and str(fertilizer).strip():
-                stats['fertilizer_events'] += 1
-            
-            if any(x and str(x).strip() for x in [wash, neemoil, pestmix]):
-                stats['treatment_events'] += 1
-    
-    wb.close()
-    
-    stats['unique_plants'] = len(stats['unique_plants'])
-    stats['unique_dates'] = len(stats['unique_dates'])
+    # Only the counts are needed here, so drain the row stream
+    deque(iter_excel_rows(excel_path, stats), maxlen=0)
     
     return stats
 
 def count_database_data(session_factory) -> dict:
     """Count records in database."""
-    stats = {}
-    
+    # One round-trip and a single scan of daily_care for all counts
     with session_factory() as session:
-        stats['total_plants'] = session.query(Plant).count()
-        stats['total_care_records'] = session.query(DailyCare).count()
-        
-        # Unique dates
-        unique_dates = session.query(func.count(func.distinct(DailyCare.care_date))).scalar()
-        stats['unique_dates'] = unique_dates
-        
-        # Activity counts
-        stats['water_events'] = session.query(DailyCare).filter(DailyCare.water_ml.isnot(None)).count()
-        stats['fertilizer_events'] = session.query(DailyCare).filter(DailyCare.fertilizer.isnot(None)).count()
-        stats['treatment_events'] = session.query(DailyCare).filter(DailyCare.treatment.isnot(None)).count()
+        row = session.execute(text("""
+            SELECT
+                (SELECT COUNT(*) FROM plants) AS total_plants,
+                COUNT(*) AS total_care_records,
+                COUNT(DISTINCT care_date) AS unique_dates,
+                COUNT(*) FILTER (WHERE water_ml IS NOT NULL) AS water_events,
+                COUNT(*) FILTER (WHERE fertilizer IS NOT NULL) AS fertilizer_events,
+                COUNT(*) FILTER (WHERE treatment IS NOT NULL) AS treatment_events
+            FROM daily_care
+        """)).one()
     
-    return stats
+    return dict(row._mapping)
 
 def show_sample_data(session_factory):
     """Show sample migrated data."""
@@ -108,31 +144,35 @@ def show_sample_data(session_factory):
     
     with session_factory() as session:
         # Show some plants
-        plants = session.query(Plant).limit(5).all()
+        plants = session.query(Plant.id, Plant.name).limit(5).all()
         print("Sample plants:")
-        for plant in plants:
-            print(f"  • ID {plant.id}: {plant.name}")
+        for plant_id, plant_name in plants:
+            print(f"  • ID {plant_id}: {plant_name}")
         
         # Show some care records
-        care_records = session.query(DailyCare, Plant.name)\
+        # Plain column tuples: no DailyCare objects are hydrated just to print them
+        care_records = session.query(
+                DailyCare.care_date, Plant.name, DailyCare.water_ml,
+                DailyCare.fertilizer, DailyCare.treatment, DailyCare.condition,
+            )\
             .join(Plant)\
             .limit(5)\
             .all()
         
         print("\nSample care records:")
-        for care, plant_name in care_records:
+        for care_date, plant_name, water_ml, fertilizer, treatment, condition in care_records:
             activities = []
-            if care.water_ml:
-                activities.append(f"💧{care.water_ml}ml")
-            if care.fertilizer:
-                activities.append(f"🌿{care.fertilizer}")
-            if care.treatment:
-                activities.append(f"🧴{care.treatment}")
-            if care.condition:
-                activities.append(f"📝{care.condition}")
+            if water_ml:
+                activities.append(f"💧{water_ml}ml")
+            if fertilizer:
+                activities.append(f"🌿{fertilizer}")
+            if treatment:
+                activities.append(f"🧴{treatment}")
+            if condition:
+                activities.append(f"📝{condition}")
             
             activity_str = " + ".join(activities) if activities else "No activities"
-            print(f"  • {care.care_date} | {plant_name} | {activity_str}")
+            print(f"  • {care_date} | {plant_name} | {activity_str}")
 
 def test_relationships(session_factory):
     """Test that foreign key relationships work."""
@@ -141,8 +181,8 @@ def test_relationships(session_factory):
     
     with session_factory() as session:
         # Test join query
-        join_count = session.query(DailyCare).join(Plant).count()
-        care_count = session.query(DailyCare).count()
+        join_count = count_rows(session, DailyCare.id, select_from=DailyCare, join=Plant)
+        care_count = count_rows(session, DailyCare.id)
         
         if join_count == care_count:
             print("✅ All care records have valid plant references")
@@ -150,15 +190,22 @@ def test_relationships(session_factory):
             print(f"❌ Found orphaned care records: {care_count - join_count}")
         
         # Test relationship navigation
-        sample_plant = session.query(Plant).first()
+        sample_plant = session.query(Plant.id, Plant.name).limit(1).first()
         if sample_plant:
-            care_count = len(sample_plant.care_records)
+            # Count through Plant.care_records without loading the records
+            care_count = count_rows(
+                session, DailyCare.id, Plant.id == sample_plant.id,
+                select_from=Plant, join=Plant.care_records,
+            )
             print(f"✅ Relationship test: {sample_plant.name} has {care_count} care records")
         
-        sample_care = session.query(DailyCare).first()
+        # Joining through DailyCare.plant tests the relationship without hydrating rows
+        sample_care = session.query(DailyCare.id, Plant.name)\
+            .join(DailyCare.plant)\
+            .limit(1)\
+            .first()
         if sample_care:
-            plant_name = sample_care.plant.name
-            print(f"✅ Back-reference test: Care record belongs to {plant_name}")
+            print(f"✅ Back-reference test: Care record belongs to {sample_care.name}")
 
 def show_interesting_queries(session_factory):
     """Show some interesting queries you can now run."""
@@ -177,14 +224,15 @@ def show_interesting_queries(session_factory):
             print(f"Most recent watering: {recent_watering[0]} got {recent_watering[2]}ml on {recent_watering[1]}")
         
         # Plant with most care records
-        plant_with_most_care = session.query(Plant.name, func.count(DailyCare.id).label('care_count'))\
-            .join(DailyCare)\
-            .group_by(Plant.id, Plant.name)\
+        # Aggregate daily_care alone, then look up only the winning plant's name
+        plant_with_most_care = session.query(DailyCare.plant_id, func.count(DailyCare.id).label('care_count'))\
+            .group_by(DailyCare.plant_id)\
             .order_by(func.count(DailyCare.id).desc())\
             .first()
         
         if plant_with_most_care:
-            print(f"Most tracked plant: {plant_with_most_care[0]} with {plant_with_most_care[1]} care records")
+            plant_name = session.query(Plant.name).filter(Plant.id == plant_with_most_care.plant_id).scalar()
+            print(f"Most tracked plant: {plant_name} with {plant_with_most_care.care_count} care records")
         
         # Total water used
         total_water = session.query(func.sum(DailyCare.water_ml)).scalar() or 0
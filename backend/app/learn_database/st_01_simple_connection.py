@@ -2,38 +2,37 @@
 import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL, Engine
 from sqlalchemy.exc import SQLAlchemyError
 
-def get_db_config() -> dict:
-    db_config = {
-        "host": os.getenv("DB_HOST"),
-        "port": os.getenv("DB_PORT", "5432"),
-        "database": os.getenv("DB_NAME"),
-        "username": os.getenv("DB_USER"),
-        "password": os.getenv("DB_PASSWORD"),
-    }
-    return db_config
-
-def validate(db_config: dict) -> None:
-    required_keys = ("host", "database", "username", "password")
-    missing = [k for k in required_keys if not db_config.get(k)]
+load_dotenv()  # load .env from project root
+
+REQUIRED_VARS = ("DB_HOST", "DB_NAME", "DB_USER", "DB_PASSWORD")
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"  # DB_ECHO=true turns on SQL logging
+
+def validate() -> None:
+    missing = [k for k in REQUIRED_VARS if not os.getenv(k)]
     if missing:
         raise ValueError(f"Missing config values: {', '.join(missing)}")
 
-def build_url(db_config: dict) -> str:
-    connection_string = (
-        f"postgresql://{db_config['username']}:{db_config['password']}"
-        f"@{db_config['host']}:{db_config['port']}/{db_config['database']}"
+def build_engine() -> Engine:
+    # URL.create escapes special characters (e.g. "@" or "/") in the password
+    url = URL.create(
+        drivername="postgresql",
+        username=os.environ["DB_USER"],
+        password=os.environ["DB_PASSWORD"],
+        host=os.environ["DB_HOST"],
+        port=int(os.getenv("DB_PORT", "5432")),
+        database=os.environ["DB_NAME"],
     )
-    return connection_string
+    return create_engine(url, echo=DB_ECHO, pool_pre_ping=True, pool_recycle=3600)
 
 def main() -> None:
-    load_dotenv()  # load .env from project root
-    db_cfg = get_db_config()
-    validate(db_cfg)
+    validate()
+    engine = build_engine()
+    url = engine.url
 
-    print(f"Connecting to {db_cfg['host']}:{db_cfg['port']} / {db_cfg['database']} as {db_cfg['username']}")
-    engine = create_engine(build_url(db_cfg), echo=True, pool_pre_ping=True, pool_recycle=3600)
+    print(f"Connecting to {url.host}:{url.port} / {url.database} as {url.username}")
 
     try:
         with engine.connect() as conn:
@@ -59,9 +59,11 @@ class CareActivity(Base):
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
 
+    # "select" loads the plant only when accessed; use joinedload()/selectinload()
+    # at the query when the plant is needed, instead of joining on every query
     plant: Mapped[Plant] = relationship(
         back_populates="care_activities",
-        lazy="joined",
+        lazy="select",
     )
 
     __table_args__ = (
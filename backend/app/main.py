@@ -1,25 +1,34 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
+import gzip
+import hashlib
+import mimetypes
 import os
+import sys
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from typing import Optional
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, RedirectResponse, Response
 
 from .core.excel_handler import ExcelHandler
-from .models.plant import Plant
+from .models.plant import Plant, format_date
 
 # Initialize FastAPI app
 app = FastAPI(title="Blumn Plant Care Tracker")
 
 # Configure CORS
-origins = os.environ.get("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
+origins = [origin.strip() for origin in os.environ.get("ALLOWED_ORIGINS", "http://localhost:3000").split(",") if origin.strip()]
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # The frontend only reads data (plain GET fetches without custom headers)
+    allow_methods=["GET", "HEAD", "OPTIONS"],
+    allow_headers=["Content-Type"],
 )
 
 # Initialize Excel handler with absolute path
@@ -28,143 +37,279 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 EXCEL_FILE_PATH = os.environ.get('DATA_PATH', os.path.join(BASE_DIR, "data", "blumen_data.xlsx"))
 excel_handler = ExcelHandler(EXCEL_FILE_PATH)
 
+def find_frontend_pages(export_dir: Path) -> dict:
+    """
+    Map every route of the static export to its HTML file, e.g.
+    plants/overview -> frontend/out/plants/overview/index.html (preferred) or frontend/out/plants/overview.html
+    Routes are keyed like os.path.normpath of the request path ("." is the root).
+    """
+    flat_pages = {}
+    folder_pages = {}
+    for dirpath, _, filenames in os.walk(export_dir):
+        rel_dir = os.path.relpath(dirpath, export_dir)
+        for filename in filenames:
+            if not filename.endswith(".html"):
+                continue
+            file_path = os.path.join(dirpath, filename)
+            if filename == "index.html":
+                folder_pages[rel_dir] = file_path
+            # plants/overview.html (root files have no "./" prefix in normalised paths)
+            flat_route = os.path.normpath(os.path.join(rel_dir, filename[:-len(".html")]))
+            flat_pages[flat_route] = file_path
+    
+    # Folder style (plants/overview/index.html) wins over flat html, as before
+    return {**flat_pages, **folder_pages}
+
+def load_html_page(file_path: str) -> tuple:
+    """Read an exported HTML page into (body, gzipped body, etag)"""
+    body = Path(file_path).read_bytes()
+    return body, gzip.compress(body, 6), f'"{hashlib.md5(body).hexdigest()}"'
+
+def html_page_response(request: Request, page: tuple) -> Response:
+    """
+    Serve a page loaded by load_html_page, gzipped when the client accepts it.
+    HTML shells are revalidated on every load (no-cache + ETag), so a new deploy shows up immediately.
+    """
+    body, gzipped, etag = page
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(gzipped, media_type="text/html", headers={**headers, "Content-Encoding": "gzip"})
+    return Response(body, media_type="text/html", headers=headers)
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that adds a Cache-Control header (the ETag comes from StaticFiles itself)"""
+    def __init__(self, *args, cache_control: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = self.cache_control
+        return response
+
+class PlantImageCache:
+    """In-memory LRU of plant image bytes, bounded by their total size"""
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # path -> (mtime, body)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: str, mtime: float) -> bytes:
+        """Image bytes for path, read from disk if not cached or the file changed"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == mtime:
+                self._entries.move_to_end(path)
+                return entry[1]
+
+        body = Path(path).read_bytes()
+
+        with self._lock:
+            old_entry = self._entries.pop(path, None)
+            if old_entry is not None:
+                self._size -= len(old_entry[1])
+            if len(body) <= self.max_bytes:
+                self._entries[path] = (mtime, body)
+                self._size += len(body)
+                # Evict least recently used images until we fit again
+                while self._size > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return body
+
 # Check if running in production mode (Heroku)
 IS_PRODUCTION = os.environ.get("PRODUCTION", "False").lower() == "true"
 
+# Print debug output (e.g. the periodicity table) to the console
+DEBUG = os.environ.get("BLUMN_DEBUG", "False").lower() == "true"
+
 # If in production, serve frontend static files
 if IS_PRODUCTION:
     # Path to the static export directory produced by `next export`
-    EXPORT_DIR = os.path.join(BASE_DIR, "frontend", "out")
+    EXPORT_DIR = BASE_DIR / "frontend" / "out"
 
     # The exported site will contain an "_next" folder with JS chunks + assets
-    next_export_static = os.path.join(EXPORT_DIR, "_next")
+    next_export_static = EXPORT_DIR / "_next"
 
     # Plant images directory
-    plant_images_dir = os.path.join(EXPORT_DIR, "plant_images")
+    plant_images_dir = EXPORT_DIR / "plant_images"
 
     # Mount the entire export directory at "/" **after** API routes are defined via a catch-all.
     # We still mount the _next folder explicitly so that hashed asset URLs are served efficiently.
-    if os.path.exists(next_export_static):
-        app.mount("/_next", StaticFiles(directory=next_export_static), name="next-export-static")
+    if next_export_static.exists():
+        # Asset URLs under _next contain a content hash, so they never change
+        app.mount(
+            "/_next",
+            CachedStaticFiles(directory=next_export_static, cache_control="public, max-age=31536000, immutable"),
+            name="next-export-static",
+        )
 
     # Mount exported root at /static for CSS/JS chunks created by Next build (e.g. "assets/..." when using Tailwind etc.)
     app.mount("/static", StaticFiles(directory=EXPORT_DIR), name="frontend-static")
 
-    # Mount plant images directory explicitly so <img src="/plant_images/foo.jpg" /> works
-    if os.path.exists(plant_images_dir):
-        app.mount("/plant_images", StaticFiles(directory=plant_images_dir), name="plant-images")
+    # Plant images are served by the plant_image route so <img src="/plant_images/foo.jpg" /> works;
+    # only files found here at startup can be requested, so there is no path traversal
+    PLANT_IMAGES = {}
+    if plant_images_dir.exists():
+        for image_path in plant_images_dir.rglob("*"):
+            if image_path.is_file():
+                media_type = mimetypes.guess_type(image_path.name)[0] or "application/octet-stream"
+                PLANT_IMAGES[image_path.relative_to(plant_images_dir).as_posix()] = (str(image_path), media_type)
 
     # Make the export directory path accessible to other handlers
     FRONTEND_EXPORT_DIR = EXPORT_DIR
+    FRONTEND_INDEX_PATH = EXPORT_DIR / "index.html"
+
+    # Resolve page routes and read the pages once at startup,
+    # so serving a page needs no filesystem access (index.html files appear under two routes)
+    page_files = find_frontend_pages(EXPORT_DIR)
+    page_contents = {path: load_html_page(path) for path in set(page_files.values())}
+    FRONTEND_PAGES = {route: page_contents[path] for route, path in page_files.items()}
 else:
     FRONTEND_EXPORT_DIR = None
+    FRONTEND_INDEX_PATH = None
+    FRONTEND_PAGES = {}
+    PLANT_IMAGES = {}
+
+# Hot plant images stay in memory (the photos are several MB each)
+plant_image_cache = PlantImageCache(max_bytes=64 * 1024 * 1024)
+
+# Constant API payloads, serialized once at import
+WELCOME_JSON = JSONResponse({"message": "Welcome to Blumn Plant Care Tracker"}).body
+OVERVIEW_JSON = JSONResponse({
+    "plants": [
+        {"name": "Plant 1", "status": "Needs water", "days_since_watering": 7},
+        {"name": "Plant 2", "status": "Healthy", "days_since_watering": 2}
+    ]
+}).body
 
 @app.get("/")
 async def root(request: Request):
     # In production, serve the frontend's main index.html
     if IS_PRODUCTION and FRONTEND_EXPORT_DIR:
-        index_html_path = os.path.join(FRONTEND_EXPORT_DIR, "index.html")
+        index_html = FRONTEND_PAGES.get(".")
 
-        if os.path.exists(index_html_path):
-            return FileResponse(index_html_path, media_type="text/html")
+        if index_html is not None:
+            return html_page_response(request, index_html)
         else:
-            print(f"Warning: Frontend index.html not found at {index_html_path}")
+            print(f"Warning: Frontend index.html not found at {FRONTEND_INDEX_PATH}")
             return {"message": "Welcome to Blumn Plant Care Tracker - Frontend not found"}
 
     # Default API response if not production or index.html not found
-    return {"message": "Welcome to Blumn Plant Care Tracker"}
+    return Response(WELCOME_JSON, media_type="application/json")
+
+# Serialized JSON responses: key -> (version, body, etag)
+json_response_cache = {}
+
+def cached_json_response(request: Request, key: str, version, build) -> Response:
+    """
+    Return build()'s content as JSON, serialized once per version.
+    Answers 304 when the client already has this version (If-None-Match).
+    A version of None (data failed to load) is never cached.
+    """
+    entry = json_response_cache.get(key)
+    if entry is None or version is None or entry[0] != version:
+        # Same rendering FastAPI would apply to the returned content
+        body = JSONResponse(jsonable_encoder(build())).body
+        entry = (version, body, f'W/"{key}-{version}"')
+        if version is not None:
+            json_response_cache[key] = entry
+    
+    _, body, etag = entry
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(body, media_type="application/json", headers={"ETag": etag})
 
 @app.get("/api/plants")
-async def get_plants():
+def get_plants(request: Request):
     """Get all plant data"""
     try:
-        data = excel_handler.read_data()
-        # Format dates as dd.mm.yyyy
-        for item in data:
-            if item.get("date") and not isinstance(item["date"], str):
-                try:
-                    item["date"] = item["date"].strftime("%d.%m.%Y")
-                except:
-                    pass
-        return {"status": "success", "data": data}
+        # Dates are already formatted as dd.mm.yyyy, once per Excel file version
+        return cached_json_response(
+            request, "plants", excel_handler.get_data_version(),
+            lambda: {"status": "success", "data": excel_handler.get_formatted_data()},
+        )
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 @app.get("/api/plants/today")
-async def get_todays_plants():
+def get_todays_plants(request: Request):
     """Get all plants with their current care status"""
     try:
-        plants = excel_handler.get_todays_plants()
-        # Convert to dict and format dates
-        plants_data = []
-        for plant in plants:
-            plant_dict = plant.dict()
-            # Format dates as dd.mm.yyyy
-            if plant_dict.get("last_watered"):
-                plant_dict["last_watered"] = plant_dict["last_watered"].strftime("%d.%m.%Y")
-            if plant_dict.get("last_fertilized"):
-                plant_dict["last_fertilized"] = plant_dict["last_fertilized"].strftime("%d.%m.%Y")
-            plants_data.append(plant_dict)
-        return plants_data
+        # Days since care change with the date, so it is part of the version
+        version = excel_handler.get_data_version()
+        if version is not None:
+            version = f"{version}-{datetime.now().date().isoformat()}"
+        # Plant serializes its dates as dd.mm.yyyy itself
+        return cached_json_response(request, "today", version, excel_handler.get_todays_plants)
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 @app.get("/api/plants/periodicity")
-async def test_watering_periodicity():
+def test_watering_periodicity():
     """Test the watering periodicity calculation for all plants"""
     try:
         plants = excel_handler.get_todays_plants()
+        today = datetime.now().date()
         results = []
         
-        # Print a header to the console (commented out for performance)
-        # print("\n" + "="*80)
-        # print(f"{'PLANT NAME':<30} {'PERIODICITY':<15} {'FIRST RECORD':<15} {'DAYS SINCE':<12} {'EVENTS':<8} {'DEFAULT'}")
-        # print("-"*80)
-        
         for plant in plants:
+            # History and watering dates come from indexes built once per file version
+            plant_history = excel_handler.get_plant_history(plant.name)
+            watering_dates = excel_handler.get_watering_dates(plant.name)
+            
             # Calculate periodicity
-            periodicity, calculation_method = calculate_watering_periodicity(plant.name)
+            periodicity, calculation_method = calculate_watering_periodicity(plant.name, watering_dates)
             
             # Get the first record date for this plant
-            plant_history = excel_handler.get_plant_history(plant.name)
             first_record = plant_history[0]["date"] if plant_history else None
-            days_since_first_record = (datetime.now().date() - first_record).days if first_record else None
+            days_since_first_record = (today - first_record).days if first_record else None
             
             # Count watering events
-            watering_events = 0
-            for entry in plant_history:
-                days_wo_water = entry.get("days without water")
-                water_entry = entry.get("water")
-                if days_wo_water == 0 or (isinstance(days_wo_water, str) and days_wo_water.strip() == "0") or water_entry:
-                    watering_events += 1
-            
-            # Print to console (commented out for performance)
-            # first_record_str = first_record.strftime("%d.%m.%Y") if first_record else "N/A"
-            # periodicity_str = f"{round(periodicity, 1)}" if periodicity is not None else "N/A"
-            # days_str = f"{days_since_first_record}" if days_since_first_record is not None else "N/A"
-            # 
-            # print(f"{plant.name:<30} {periodicity_str:<15} {first_record_str:<15} {days_str:<12} {watering_events:<8} {plant.watering_schedule}")
+            watering_events = len(watering_dates)
             
             # Add to results
             results.append({
                 "plant_name": plant.name,
                 "calculated_periodicity": round(periodicity, 1) if periodicity is not None else None,
                 "calculation_method": calculation_method,
-                "first_record_date": first_record.strftime("%d.%m.%Y") if first_record else None,
+                "first_record_date": format_date(first_record) if first_record else None,
                 "days_since_first_record": days_since_first_record,
                 "watering_events": watering_events,
                 "default_schedule": plant.watering_schedule
             })
         
-        # Print footer (commented out for performance)
-        # print("="*80 + "\n")
+        if DEBUG:
+            print_periodicity_table(results)
         
         return {"status": "success", "data": results}
     except Exception as e:
         print(f"Error: {str(e)}")
         return {"status": "error", "message": str(e), "traceback": str(e.__traceback__)}
 
-def calculate_watering_periodicity(plant_name: str) -> tuple:
+def print_periodicity_table(results: list):
+    """Print the periodicity results as a console table, written in one go"""
+    lines = [
+        "",
+        "=" * 80,
+        f"{'PLANT NAME':<30} {'PERIODICITY':<15} {'FIRST RECORD':<15} {'DAYS SINCE':<12} {'EVENTS':<8} {'DEFAULT'}",
+        "-" * 80,
+    ]
+    for result in results:
+        periodicity_str = f"{result['calculated_periodicity']}" if result["calculated_periodicity"] is not None else "N/A"
+        first_record_str = result["first_record_date"] or "N/A"
+        days_str = f"{result['days_since_first_record']}" if result["days_since_first_record"] is not None else "N/A"
+        lines.append(f"{result['plant_name']:<30} {periodicity_str:<15} {first_record_str:<15} {days_str:<12} {result['watering_events']:<8} {result['default_schedule']}")
+    lines.append("=" * 80)
+    
+    sys.stdout.write("\n".join(lines) + "\n\n")
+    sys.stdout.flush()
+
+def calculate_watering_periodicity(plant_name: str, watering_dates: Optional[list] = None) -> tuple:
     """
     Calculate the actual watering periodicity of a plant considering only
     the time between actual watering events.
@@ -173,84 +318,75 @@ def calculate_watering_periodicity(plant_name: str) -> tuple:
     For plants with 5 or more watering events, uses a moving average of the
     5 most recent watering intervals.
     
+    Pass watering_dates when they have already been fetched;
+    otherwise they are looked up by plant_name.
+    
     Returns:
         Tuple: (periodicity_value, calculation_method)
         where calculation_method is 'mean' or 'moving_avg'
     """
-    # Get all rows for this plant, ordered by date
-    plant_data = excel_handler.get_plant_history(plant_name)
-    
-    if not plant_data:
-        return None, None  # No data available
-    
-    # Find all watering events (days where days_without_water = 0)
-    watering_dates = []
-    for entry in plant_data:
-        days_wo_water = entry.get("days without water")
-        water_entry = entry.get("water")
-        if days_wo_water == 0 or (isinstance(days_wo_water, str) and days_wo_water.strip() == "0") or water_entry:
-            watering_dates.append(entry["date"])
+    if watering_dates is None:
+        # Watering event dates for this plant, ordered by date
+        watering_dates = excel_handler.get_watering_dates(plant_name)
     
     if len(watering_dates) <= 1:
         # Not enough data points to calculate periodicity
         return None, None
     
-    # Calculate time differences between consecutive waterings
-    intervals = []
-    for i in range(1, len(watering_dates)):
-        days_between = (watering_dates[i] - watering_dates[i-1]).days
-        intervals.append(days_between)
-    
-    # Calculate average interval
-    if intervals:
-        if len(intervals) < 5:
-            # For plants with fewer than 5 watering events, use simple average
-            return sum(intervals) / len(intervals), "mean"
-        else:
-            # For plants with 5 or more watering events, use moving average of last 5 intervals
-            recent_intervals = intervals[-5:]
-            return sum(recent_intervals) / len(recent_intervals), "moving_avg"
-    
-    return None, None  # If we couldn't calculate periodicity
+    # The intervals between consecutive waterings sum to the span they cover,
+    # so their average is (last - first) / number of intervals
+    num_intervals = len(watering_dates) - 1
+    if num_intervals < 5:
+        # For plants with fewer than 5 watering intervals, use simple average
+        return (watering_dates[-1] - watering_dates[0]).days / num_intervals, "mean"
+    else:
+        # For plants with 5 or more watering intervals, use moving average of last 5 intervals
+        return (watering_dates[-1] - watering_dates[-6]).days / 5, "moving_avg"
 
 @app.get("/api/plants/overview")
 async def plants_overview(request: Request):
     """API endpoint for plants overview"""
     # Return API data - frontend will handle the presentation
-    return {
-        "plants": [
-            {"name": "Plant 1", "status": "Needs water", "days_since_watering": 7},
-            {"name": "Plant 2", "status": "Healthy", "days_since_watering": 2}
-        ]
-    }
-
-def request_is_browser(request=None):
+    return Response(OVERVIEW_JSON, media_type="application/json")
+
+def request_is_browser(request: Request) -> bool:
     """Helper function to determine if request is from a browser"""
-    if request is None:
-        # Try to get request from current function frame
-        import inspect
-        frame = inspect.currentframe()
-        while frame:
-            if 'request' in frame.f_locals:
-                request = frame.f_locals['request']
-                break
-            frame = frame.f_back
-    
-    if request and hasattr(request, 'headers'):
-        accept = request.headers.get('accept', '')
-        return 'text/html' in accept
-    return False
+    return 'text/html' in request.headers.get('accept', '')
+
+@app.api_route("/plant_images/{name:path}", methods=["GET", "HEAD"])
+def plant_image(name: str, request: Request):
+    """Serve a plant image from the in-memory cache (HEAD gets the headers only)"""
+    image = PLANT_IMAGES.get(name)
+    if image is None:
+        return Response(status_code=404)
+
+    path, media_type = image
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return Response(status_code=404)
+
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    if request.method == "HEAD":
+        return Response(media_type=media_type, headers={**headers, "Content-Length": str(stat.st_size)})
+    return Response(plant_image_cache.get(path, stat.st_mtime_ns), media_type=media_type, headers=headers)
+
+# First path segments that never map to a frontend page
+NON_PAGE_PREFIXES = frozenset({"api", "_next", "static", "plant_images"})
 
 # Catch-all route for serving Next.js frontend pages in production
 @app.get("/{full_path:path}")
 async def serve_frontend(full_path: str, request: Request):
     # Skip API routes (this check should be robust)
-    if (full_path.startswith("api/") or full_path.startswith("_next/") or
-        full_path.startswith("static/") or full_path.startswith("plant_images/")):
+    first_segment, separator, _ = full_path.partition("/")
+    if separator and first_segment in NON_PAGE_PREFIXES:
         # Let FastAPI handle these if they are actual API routes or static file requests
         # If they are not matched by other routes, FastAPI will return its own 404
         # For this specific case, if it starts with "api/", it's an API call, so return 404.
-        if full_path.startswith("api/"):
+        if first_segment == "api":
              return {"detail": "API route not found"}, 404 # Return a proper 404 for API
         # For _next and static, StaticFiles middleware should handle it. If it reaches here, something is wrong.
         # This return statement will likely not be hit if StaticFiles is configured correctly.
@@ -260,23 +396,14 @@ async def serve_frontend(full_path: str, request: Request):
         # Attempt to resolve a static HTML file that matches the requested path within the export directory
         # e.g. /plants/overview -> frontend/out/plants/overview/index.html (preferred) or frontend/out/plants/overview.html
 
-        # Normalise path to avoid directory traversal
+        # Only pages found in the export at startup can be served, so there is no directory traversal
         safe_path = os.path.normpath(full_path).lstrip("/\\")
 
-        # First try folder style path (plants/overview/index.html)
-        candidate_a = os.path.join(FRONTEND_EXPORT_DIR, safe_path, "index.html")
-        # Then flat html (plants/overview.html)
-        candidate_b = os.path.join(FRONTEND_EXPORT_DIR, f"{safe_path}.html")
-
-        if os.path.exists(candidate_a):
-            return FileResponse(candidate_a, media_type="text/html")
-        if os.path.exists(candidate_b):
-            return FileResponse(candidate_b, media_type="text/html")
-
-        # Fallback to root index.html (client-side routing may handle it)
-        fallback_index = os.path.join(FRONTEND_EXPORT_DIR, "index.html")
-        if os.path.exists(fallback_index):
-            return FileResponse(fallback_index, media_type="text/html")
+        # Folder style path (plants/overview/index.html) or flat html (plants/overview.html),
+        # then fallback to root index.html (client-side routing may handle it)
+        page = FRONTEND_PAGES.get(safe_path, FRONTEND_PAGES.get("."))
+        if page is not None:
+            return html_page_response(request, page)
         
         print(f"CRITICAL: Could not resolve static page for path '{full_path}' in export dir {FRONTEND_EXPORT_DIR}")
         return {"detail": "Frontend page not found in static export."}, 404
@@ -1,6 +1,11 @@
 from datetime import date
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, field_serializer
+
+def format_date(value: date) -> str:
+    """Format a date (or datetime) as dd.mm.yyyy"""
+    # Plain integer formatting, cheaper than strftime("%d.%m.%Y") in per-row loops
+    return f"{value.day:02d}.{value.month:02d}.{value.year:04d}"
 
 class Plant(BaseModel):
     id: int
@@ -12,4 +17,9 @@ class Plant(BaseModel):
     watering_schedule: int = 7  # default to weekly
     fertilizing_schedule: int = 14  # default to bi-weekly
     needs_water: bool = False
-    needs_fertilizer: bool = False 
\ No newline at end of file
+    needs_fertilizer: bool = False
+
+    @field_serializer("last_watered", "last_fertilized")
+    def serialize_date(self, value: Optional[date]) -> Optional[str]:
+        # Dates go out as dd.mm.yyyy
+        return format_date(value) if value else None 
\ No newline at end of file
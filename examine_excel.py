@@ -3,6 +3,7 @@
 Simple script to examine the Excel file structure
 """
 import openpyxl
+from collections import Counter
 from datetime import datetime
 
 def examine_excel_file(file_path):
@@ -10,50 +11,52 @@ def examine_excel_file(file_path):
     print("🔍 Examining Excel file:", file_path)
     print("=" * 50)
     
-    # Load the workbook
-    wb = openpyxl.load_workbook(file_path)
+    # Load the workbook read-only and go through its rows once
+    wb = openpyxl.load_workbook(file_path, read_only=True)
     ws = wb.active
     
+    rows = ws.iter_rows(values_only=True)
+    headers = list(next(rows, ()))
+    max_row = 1
+    max_column = len(headers)
+    first_rows = []
+    plant_counts = Counter()
+    dates = set()
+    for row_num, row in enumerate(rows, 2):
+        max_row = row_num
+        max_column = max(max_column, len(row))
+        if row_num < 7:
+            first_rows.append((row_num, list(row)))
+        
+        # Plant name (column 2)
+        if len(row) > 1 and row[1]:
+            plant_counts[row[1]] += 1
+        
+        # Date (column 1)
+        if row and row[0]:
+            dates.add(row[0])
+    
     print(f"📊 File info:")
-    print(f"   Max rows: {ws.max_row}")
-    print(f"   Max columns: {ws.max_column}")
+    print(f"   Max rows: {max_row}")
+    print(f"   Max columns: {max_column}")
     
     # Get headers
     print(f"\n📋 Column headers:")
-    headers = []
-    for col in range(1, ws.max_column + 1):
-        header = ws.cell(row=1, column=col).value
-        headers.append(header)
+    for col, header in enumerate(headers, 1):
         print(f"   Column {col}: {header}")
     
     # Show first 5 data rows
     print(f"\n📝 First 5 data rows:")
-    for row_num in range(2, min(7, ws.max_row + 1)):
-        row_data = []
-        for col in range(1, ws.max_column + 1):
-            cell_value = ws.cell(row=row_num, column=col).value
-            row_data.append(cell_value)
+    for row_num, row_data in first_rows:
         print(f"   Row {row_num}: {row_data}")
     
     # Analyze data types and patterns
     print(f"\n🔍 Data analysis:")
     
-    # Count unique plant names
-    plant_names = set()
-    dates = set()
-    for row_num in range(2, ws.max_row + 1):
-        # Plant name (column 2)
-        plant_name = ws.cell(row=row_num, column=2).value
-        if plant_name:
-            plant_names.add(plant_name)
-        
-        # Date (column 1)  
-        date_value = ws.cell(row=row_num, column=1).value
-        if date_value:
-            dates.add(date_value)
-    
-    print(f"   Unique plants: {len(plant_names)}")
-    print(f"   Plant names: {sorted(list(plant_names))}")
+    # Unique plant names
+    print(f"   Unique plants: {len(plant_counts)}")
+    print(f"   Plant names: {sorted(plant_counts)}")
+    print(f"   Rows per plant: {dict(plant_counts.most_common())}")
     print(f"   Unique dates: {len(dates)}")
     
     # Show date range
@@ -74,7 +77,7 @@ def examine_excel_file(file_path):
             print(f"   Date range: {date_objects[0]} to {date_objects[-1]}")
     
     wb.close()
-    return headers, len(plant_names), len(dates)
+    return headers, len(plant_counts), len(dates)
 
 if __name__ == "__main__":
     examine_excel_file("data/blumen_data.xlsx") 
\ No newline at end of file